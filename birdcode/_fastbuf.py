@@ -0,0 +1,112 @@
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # Numba is optional; the kernels below also run as plain NumPy
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# Layout of the int64 state array shared by the ring buffer kernels
+WRITE, READ, DROPPED = 0, 1, 2
+
+
+@njit(cache=True)
+def push_samples(data, state, samples):
+    """
+    Copies as many samples as fit into the power-of-two sized ring ``data``,
+    advancing the write counter in ``state``. Returns the number of samples written.
+    """
+    size = data.shape[0]
+    n = min(samples.shape[0], size - (state[WRITE] - state[READ]))
+    state[DROPPED] += samples.shape[0] - n
+
+    start = state[WRITE] & (size - 1)
+    first = min(n, size - start)
+    data[start:start + first] = samples[:first]
+    data[:n - first] = samples[first:n]
+
+    # Publish only after the data is in place
+    state[WRITE] += n
+    return n
+
+
+@njit(cache=True)
+def pop_samples(data, state, out):
+    """
+    Moves up to ``len(out)`` samples out of the ring ``data``, advancing the read
+    counter in ``state``. Returns the number of samples read.
+    """
+    size = data.shape[0]
+    n = min(out.shape[0], state[WRITE] - state[READ])
+
+    start = state[READ] & (size - 1)
+    first = min(n, size - start)
+    out[:first] = data[start:start + first]
+    out[first:n] = data[:n - first]
+
+    # Release the space only after the data has been copied out
+    state[READ] += n
+    return n
+
+
+if HAVE_NUMBA:
+    @njit(cache=True, fastmath=True, nogil=True)
+    def chunk_stats(samples):
+        """
+        Returns (rms, peak, zero-crossing rate) of ``samples`` in a single pass. Runs
+        without the GIL so a long chunk does not stall the Python audio callback.
+        """
+        n = samples.shape[0]
+        if n == 0:
+            return 0.0, 0.0, 0.0
+        sum_sq = 0.0
+        peak = 0.0
+        crossings = 0
+        prev_neg = samples[0] < 0
+        for i in range(n):
+            x = float(samples[i])  # Widen first so int16 squares cannot overflow
+            sum_sq += x * x
+            a = abs(x)
+            if a > peak:
+                peak = a
+            neg = x < 0
+            if neg != prev_neg:
+                crossings += 1
+            prev_neg = neg
+        return np.sqrt(sum_sq / n), peak, crossings / n
+else:
+    def chunk_stats(samples):
+        """
+        Returns (rms, peak, zero-crossing rate) of ``samples``.
+        """
+        if len(samples) == 0:
+            return 0.0, 0.0, 0.0
+        if samples.dtype.kind == 'i':
+            samples = samples.astype(np.float32)  # Squares of int16 samples overflow int16
+        rms = float(np.sqrt(np.dot(samples, samples) / len(samples)))
+        peak = float(np.max(np.abs(samples)))
+        signs = np.signbit(samples)
+        crossings = np.count_nonzero(signs[1:] != signs[:-1])
+        return rms, peak, crossings / len(samples)
+
+
+def _precompile():
+    """Compiles the kernels for the sample formats and array layouts the audio pipeline
+    uses, so the first real-time callback and the first chunk do not pay the JIT cost."""
+    for dtype in ('float32', 'int16'):
+        data = np.zeros(8, dtype=dtype)
+        state = np.zeros(3, dtype=np.int64)
+        block = np.zeros((4, 2), dtype=dtype)
+        for samples in (block[:, 0], np.ascontiguousarray(block[:, 0])):  # strided and contiguous input
+            push_samples(data, state, samples)
+            pop_samples(data, state, np.zeros(4, dtype=dtype))
+        chunk_stats(data)
+
+
+_precompile()
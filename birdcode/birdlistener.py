@@ -1,21 +1,49 @@
+import functools
+import gc
 import logging
+import os
 import queue
+import sys
 import threading
-import tempfile
-import os
+import time
 import sounddevice as sd
 import numpy as np
-import soundfile as sf
-from pathlib import Path
 import birdnet
 from datetime import datetime, timezone
 from birdcode.detection import BirdDetection
 from birdcode.database import DatabaseWriter
+from birdcode.ringbuffer import RingBuffer
+from birdcode._fastbuf import chunk_stats
 
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=1)
+def _get_model(backend: str, precision: str, library: str = None):
+    """
+    Loads the BirdNET acoustic model once per process. Further BirdListener
+    instances with the same settings reuse the already loaded model.
+    """
+    _limit_inference_threads()
+    model_kwargs = {"library": library} if library is not None else {}
+    model = birdnet.load("acoustic", "2.4", backend, precision=precision, **model_kwargs)
+    # The model stays alive for the whole run; keep the cyclic GC from rescanning it
+    gc.freeze()
+    return model
+
+
+def _limit_inference_threads():
+    """
+    Sizes the TensorFlow/OpenMP thread pools, leaving cores free for the audio callback
+    and the database writer. BirdNET only imports TensorFlow when it loads a model, so
+    this runs right before that. Explicit settings in the environment win.
+    """
+    inference_threads = str(max((os.cpu_count() or 1) - 2, 1))
+    for var in ("OMP_NUM_THREADS", "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS"):
+        os.environ.setdefault(var, inference_threads)
+
+
 class BirdListener:
     def __init__(self, db_file: str, config: dict, audio_input_device: int = None):
         """
@@ -27,30 +55,78 @@ class BirdListener:
             audio_input_device (int, optional): The ID of the audio input device
                                                 to use. If None, the default device is used.
         """
-        self.fs = config.get("sample_rate", 44100)  # Sample rate
+        self.fs = config.get("sample_rate", 48000)  # Sample rate; BirdNET's native rate avoids resampling
         self.channels = config.get("channels", 1)
         self.blocksize = config.get("blocksize", 1024)
         self.chunk_seconds = config.get("chunk_seconds", 180)
         self.chunk_samples = self.chunk_seconds * self.fs
         self.detection_threshold = config.get("detection_threshold", 0.7)
+        self.batch_size = config.get("batch_size", 4)  # Max chunks per BirdNET call
+        self.batch_timeout_ms = config.get("batch_timeout_ms", 1000)
+        self.vad_rms_threshold = config.get("vad_rms_threshold", 0.0)  # 0 disables the silence gate
+        # Sample format from capture until analysis: "float32", or "int16" to halve the
+        # memory and copy bandwidth of the ring buffer and chunk pool
+        self.sample_dtype = np.dtype(config.get("sample_format", "float32"))
+        if self.sample_dtype not in (np.float32, np.int16):
+            raise ValueError(f"Unsupported sample_format '{self.sample_dtype}', use 'float32' or 'int16'.")
+        # Full scale of the sample format, used to map int16 samples onto [-1, 1)
+        self._sample_scale = 32768.0 if self.sample_dtype == np.int16 else 1.0
+
+        # Options shared by every BirdNET prediction call. BirdNET splits each chunk
+        # into 3 s windows and spreads them over ``n_workers`` inference threads,
+        # evaluating ``batch_size`` windows per model invocation.
+        self._predict_kwargs = {
+            "default_confidence_threshold": 0.01,  # Low threshold — we filter ourselves
+            "n_workers": config.get("inference_workers", min(os.cpu_count() or 1, 4)),
+            "batch_size": config.get("inference_batch_size", 1),
+        }
+        # Long-lived BirdNET prediction session (worker pool), open while the
+        # audio processing thread runs
+        self._session = None
         self.audio_input_device = audio_input_device
 
-        # Load BirdNET acoustic model ("tf" = TFLite for RPi/low-memory, "pb" = ProtoBuf for GPU)
+        # Load BirdNET acoustic model ("tf" = TFLite for RPi/low-memory, "pb" = ProtoBuf for GPU).
+        # The TFLite backend can run quantized weights ("fp16"/"int8") and the LiteRT
+        # runtime ("litert"), which applies the XNNPACK delegate on CPU.
         model_backend = config.get("model_backend", "tf")
-        self._model = birdnet.load("acoustic", "2.4", model_backend)
-
-        # Pre-allocated numpy buffer for accumulating audio data (memory-efficient)
-        self.audio_buffer = np.zeros(self.chunk_samples, dtype='float32')
+        model_library = config.get("model_library", "tflite") if model_backend == "tf" else None
+        self._model = _get_model(model_backend, config.get("model_precision", "fp32"), model_library)
+        self.pin_inference_cores = config.get("pin_inference_cores", True)
+
+        # Pool of pre-allocated chunk buffers, recycled once a chunk has been analyzed.
+        # Free indices are handed out LIFO so rarely needed buffers are never touched
+        # (and therefore never become resident memory).
+        pool_size = config.get("chunk_pool_size", self.batch_size + 1)
+        self._chunk_pool = [np.empty(self.chunk_samples, dtype=self.sample_dtype) for _ in range(pool_size)]
+        self._free_chunks = queue.LifoQueue()
+        for idx in reversed(range(pool_size)):
+            self._free_chunks.put(idx)
+
+        # Pool buffer currently accumulating audio data
+        self._chunk_idx = self._free_chunks.get()
+        self.audio_buffer = self._chunk_pool[self._chunk_idx]
         self._buffer_pos = 0
+        self._backlogged = False  # True while no pool buffer is free
+
+        # Lock-free handoff from the PortAudio callback to the chunk assembly thread.
+        # Holds ~2 s of audio so the consumer can sleep between drains.
+        self._ring = RingBuffer(2 * self.fs, self.sample_dtype)
+        self._drain_interval = 0.1  # seconds between ring buffer drains
+        self._callback = self._make_callback()
+        self._chunk_thread = None
+
+        # Audio capture backend: "sounddevice" (Python callback) or "rtmixer" (C callback)
+        self.audio_backend = config.get("audio_backend", "sounddevice")
+        self._rtmixer_action = None
 
         self._stream = None
         self._running = False
 
-        # Queue for temporary audio chunk file paths to be analyzed by BirdNET
-        self._audio_chunk_queue = queue.Queue()
+        # Queue for (pool index, chunk, completion time) to be analyzed by BirdNET
+        self._audio_chunk_queue = queue.SimpleQueue()
 
         # Database integration components
-        self._db_write_queue = queue.Queue()  # Queue for BirdDetection objects
+        self._db_write_queue = queue.SimpleQueue()  # Queue for BirdDetection objects
         self._db_writer = DatabaseWriter(db_file, self._db_write_queue)
 
         # Thread for processing audio chunks and running BirdNET analysis
@@ -61,14 +137,18 @@ class BirdListener:
         Starts the real-time audio input stream.
         """
         try:
-            self._stream = sd.InputStream(
-                samplerate=self.fs,
-                blocksize=self.blocksize,
-                channels=self.channels,
-                callback=self._callback,
-                device=self.audio_input_device
-            )
-            self._stream.start()
+            if self.audio_backend == "rtmixer":
+                self._start_rtmixer()
+            else:
+                self._stream = sd.InputStream(
+                    samplerate=self.fs,
+                    blocksize=self.blocksize,
+                    channels=self.channels,
+                    callback=self._callback,
+                    device=self.audio_input_device,
+                    dtype=self.sample_dtype.name
+                )
+                self._stream.start()
             logger.info("Real-time audio analysis started...")
             if self.audio_input_device is not None:
                 logger.info(f"Listening on audio device ID: {self.audio_input_device}")
@@ -78,66 +158,172 @@ class BirdListener:
             logger.critical(f"Failed to start audio stream: {e}", exc_info=True)
             self._running = False
 
-    def _callback(self, indata, frames, time, status):
+    def _start_rtmixer(self):
         """
-        Callback function for the sounddevice input stream.
-        Writes audio data into a pre-allocated numpy buffer and queues
-        chunks for analysis when full.
+        Starts recording through python-rtmixer, whose PortAudio callback is written
+        in C and never enters Python. The first input channel is recorded straight
+        into a PortAudio ring buffer that the chunk assembly thread drains.
         """
-        if status:
-            logger.info(f"Stream status: {status}")
-
-        # Flatten input to mono
-        samples = indata[:, 0]
-        n = len(samples)
-        end = self._buffer_pos + n
-
-        if end < self.chunk_samples:
-            # Common path: samples fit in the remaining buffer space
-            self.audio_buffer[self._buffer_pos:end] = samples
-            self._buffer_pos = end
-        else:
-            # Buffer is full — fill remaining space, queue the chunk, start fresh
-            fit = self.chunk_samples - self._buffer_pos
-            self.audio_buffer[self._buffer_pos:] = samples[:fit]
+        import rtmixer  # Optional dependency, only needed for this backend
+
+        self._stream = rtmixer.Recorder(
+            samplerate=self.fs,
+            blocksize=self.blocksize,
+            channels=self.channels,
+            device=self.audio_input_device,
+            dtype=self.sample_dtype.name
+        )
+        ring = rtmixer.RingBuffer(self.sample_dtype.itemsize, self._ring.size)
+        self._stream.start()
+        self._rtmixer_action = self._stream.record_ringbuffer(ring, channels=[1])
+        self._ring = ring  # Same readinto() interface as the numpy ring buffer
+
+    def _make_callback(self):
+        """
+        Builds the callback function for the sounddevice input stream.
+        It runs on the real-time audio thread, so it only copies the samples into the
+        lock-free ring buffer; chunking happens on the chunk assembly thread. The ring
+        buffer's kernel and arrays are bound as closure variables, sparing the attribute
+        lookups on every invocation.
+        """
+        push, data, state = self._ring.writer()
+        log_status = logger.info
 
-            audio_array = self.audio_buffer.copy().reshape(-1, 1)
-            self._save_chunk_to_queue(audio_array)
+        def callback(indata, frames, time, status):
+            if status:
+                log_status(f"Stream status: {status}")
+            push(data, state, indata[:, 0])  # Flatten input to mono
 
-            # Store any leftover samples from this callback into the reset buffer
-            remainder = n - fit
-            if remainder > 0:
-                self.audio_buffer[:remainder] = samples[fit:]
-            self._buffer_pos = remainder
+        return callback
 
-    def _save_chunk_to_queue(self, audio_data: np.ndarray):
+    def _drain_ring(self) -> int:
         """
-        Saves an audio chunk to a temporary WAV file and adds its path to the audio chunk queue.
+        Moves available samples from the ring buffer into the current pool buffer
+        and queues the chunk for analysis when full.
+        Returns the number of samples consumed.
         """
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmpfile:
-                sf.write(tmpfile.name, audio_data, self.fs)
-                self._audio_chunk_queue.put(tmpfile.name)
-        except Exception as e:
-            logger.error(f"Error saving audio chunk to temporary file: {e}", exc_info=True)
+        if self.audio_buffer is None:
+            # Every pool buffer is waiting for analysis; let the ring buffer absorb audio
+            # and drop what does not fit rather than queueing without bound
+            try:
+                self._chunk_idx = self._free_chunks.get_nowait()
+            except queue.Empty:
+                if not self._backlogged:
+                    self._backlogged = True
+                    logger.warning("Analysis is falling behind; audio will be dropped until a chunk buffer frees up.")
+                return 0
+            if self._backlogged:
+                self._backlogged = False
+                dropped = getattr(self._ring, "dropped", 0)  # Not tracked by the rtmixer ring buffer
+                logger.warning(f"Analysis caught up; {dropped} samples dropped so far.")
+            self.audio_buffer = self._chunk_pool[self._chunk_idx]
+
+        n = self._ring.readinto(self.audio_buffer[self._buffer_pos:])
+        self._buffer_pos += n
+
+        if self._buffer_pos == self.chunk_samples:
+            self._buffer_pos = 0
+            if self._is_silent(self.audio_buffer):
+                return n  # Reuse the same pool buffer for the next chunk
+
+            # Buffer is full — queue it (no copy), stamped with the time its recording
+            # ended, and continue in a free pool buffer
+            self._audio_chunk_queue.put((self._chunk_idx, self.audio_buffer,
+                                         datetime.now(timezone.utc).isoformat()))
+            self.audio_buffer = None
+        return n
+
+    def _is_silent(self, chunk: np.ndarray) -> bool:
+        """
+        Cheap energy gate run before BirdNET: returns True when the chunk's RMS is
+        below ``vad_rms_threshold``, so the expensive model call can be skipped.
+        """
+        if self.vad_rms_threshold <= 0:
+            return False
+        rms, peak, zcr = chunk_stats(chunk)
+        rms, peak = rms / self._sample_scale, peak / self._sample_scale
+        if rms < self.vad_rms_threshold:
+            logger.info(f"Skipping silent chunk (rms={rms:.5f}, peak={peak:.3f}, zcr={zcr:.3f}).")
+            return True
+        return False
+
+    def _assemble_chunks(self):
+        """
+        Worker thread function that drains the ring buffer into audio chunks.
+        """
+        while self._running:
+            try:
+                if self._drain_ring() == 0:
+                    time.sleep(self._drain_interval)
+            except Exception as e:
+                logger.error(f"Error in chunk assembly thread: {e}", exc_info=True)
+        dropped = getattr(self._ring, "dropped", 0)  # Not tracked by the rtmixer ring buffer
+        if dropped:
+            logger.warning(f"Ring buffer overflowed; {dropped} samples were dropped.")
 
     def _process_audio(self):
         """
-        Worker thread function to retrieve audio chunk paths from the queue,
+        Worker thread function to retrieve audio chunks from the queue,
         run BirdNET analysis, and queue detections for database writing.
+
+        A single BirdNET prediction session is kept open for the lifetime of the
+        thread, so its worker processes and shared buffers are set up once instead
+        of for every batch. If the session cannot be opened or fails, analysis
+        carries on with one ``predict_arrays`` call per batch.
+        """
+        if self.pin_inference_cores:
+            self._pin_to_inference_cores()
+        try:
+            with self._model.predict_session(**self._predict_kwargs, max_n_files=self.batch_size) as session:
+                self._session = session
+                logger.info("BirdNET prediction session opened.")
+                self._process_batches()
+        except Exception as e:
+            logger.error(f"BirdNET prediction session failed, analyzing without it: {e}", exc_info=True)
+        finally:
+            self._session = None
+        self._process_batches()  # Returns at once after a normal stop
+
+    @staticmethod
+    def _pin_to_inference_cores():
+        """
+        Pins the calling thread (and the BirdNET workers it spawns) to every
+        allowed core but the first one, which is left to the audio callback and
+        the database writer. Linux only; a no-op on single-core machines.
+        """
+        if not hasattr(os, "sched_setaffinity"):
+            return
+        cpus = os.sched_getaffinity(0)
+        if len(cpus) > 1:
+            os.sched_setaffinity(0, cpus - {min(cpus)})
+            logger.info(f"Inference pinned to CPUs {sorted(cpus - {min(cpus)})}.")
+
+    def _process_batches(self):
+        """
+        Groups chunks that are already waiting (up to ``batch_size``) and analyzes
+        them with a single model call to amortize per-call overhead.
         """
         while self._running:
             try:
-                audio_path = self._audio_chunk_queue.get(timeout=5)  # Wait for a chunk with a timeout
-                self.analyze(Path(audio_path))  # Perform BirdNET analysis
-                self._audio_chunk_queue.task_done()  # Mark task as complete for queue.join()
+                # Block for the first chunk, then take whatever else is ready
+                batch = [self._audio_chunk_queue.get(timeout=self.batch_timeout_ms / 1000)]
             except queue.Empty:
                 continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._audio_chunk_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                # Perform BirdNET analysis
+                self.analyze_batch([chunk for _, chunk, _ in batch], [stamp for _, _, stamp in batch])
             except Exception as e:
-                logger.error(f"Error in audio processing thread while analyzing {audio_path}: {e}", exc_info=True)
-                # Ensure the temporary file is removed even on error if possible
-                if 'audio_path' in locals() and os.path.exists(audio_path):
-                    os.remove(audio_path)
+                logger.error(f"Error in audio processing thread while analyzing {len(batch)} chunk(s): {e}",
+                             exc_info=True)
+            finally:
+                for idx, _, _ in batch:
+                    self._free_chunks.put(idx)  # Recycle the pool buffer
 
     def stop(self):
         """
@@ -146,18 +332,24 @@ class BirdListener:
         self._running = False
         logger.info("Signaling BirdListener threads to stop...")
 
-        # 1. Stop audio input stream
+        # 1. Stop audio input stream and the chunk assembly thread feeding off it
+        if self._rtmixer_action is not None:
+            self._stream.cancel(self._rtmixer_action)
+            self._rtmixer_action = None
         if self._stream and self._stream.active:
             self._stream.stop()
             self._stream.close()
             logger.info("Audio stream stopped and closed.")
 
+        if self._chunk_thread and self._chunk_thread.is_alive():
+            self._chunk_thread.join(timeout=5)
+            logger.info("Chunk assembly thread terminated.")
+
         # 2. Give the audio processing thread a chance to finish current tasks
         deadline = 10  # seconds to wait for queue to drain
-        import time as _time
         waited = 0
         while not self._audio_chunk_queue.empty() and waited < deadline:
-            _time.sleep(0.5)
+            time.sleep(0.5)
             waited += 0.5
         if self._audio_chunk_queue.empty():
             logger.info("Audio chunk queue processed pending tasks.")
@@ -181,60 +373,83 @@ class BirdListener:
         logger.info("BirdListener resources released.")
 
     @staticmethod
-    def _parse_time_to_seconds(time_value):
-        """Parse a time value to float seconds. Handles 'HH:MM:SS.ss' strings and numeric types."""
-        if isinstance(time_value, (int, float, np.floating, np.integer)):
-            return float(time_value)
-        parts = str(time_value).split(':')
-        return float(parts[0]) * 3600 + float(parts[1]) * 60 + float(parts[2])
-
-    def analyze(self, audio_path: Path):
+    def _times_to_seconds(time_values: np.ndarray) -> np.ndarray:
+        """
+        Convert a column of time values to float seconds in one vectorized pass.
+        Handles numeric columns and 'HH:MM:SS.ss' strings.
         """
-        Performs BirdNET analysis on a given audio file and queues detected birds
+        if len(time_values) == 0 or np.issubdtype(time_values.dtype, np.number):
+            return time_values.astype(np.float64)
+        hours, _, rest = np.char.partition(time_values.astype(str), ':').T
+        minutes, _, seconds = np.char.partition(rest, ':').T
+        return hours.astype(np.float64) * 3600 + minutes.astype(np.float64) * 60 + seconds.astype(np.float64)
+
+    def analyze(self, audio: np.ndarray):
+        """
+        Performs BirdNET analysis on a single audio chunk and queues detected birds
         for database writing.
         """
-        logger.info(f"Identifying species in {audio_path.name}...")
+        self.analyze_batch([audio])
+
+    def analyze_batch(self, chunks: list[np.ndarray], chunk_times: list[str] = None):
+        """
+        Performs BirdNET analysis on several in-memory audio chunks with one model
+        call and queues detected birds for database writing.
+
+        Args:
+            chunks (list[np.ndarray]): Audio chunks to analyze.
+            chunk_times (list[str]): ISO UTC time at which each chunk finished recording,
+                                     used as its detections' timestamp. Defaults to now.
+        """
+        logger.info(f"Identifying species in {len(chunks)} audio chunk(s)...")
         try:
-            # Call BirdNET model to get predictions
-            predictions = self._model.predict(
-                audio_path,
-                default_confidence_threshold=0.01,  # Low threshold — we filter ourselves
-            )
+            # Call BirdNET model once for the whole batch, straight from memory
+            if self.sample_dtype == np.int16:
+                # Decode to float only here, right before the model call
+                chunks = [np.multiply(chunk, 1.0 / self._sample_scale, dtype=np.float32) for chunk in chunks]
+            inputs = [(chunk, self.fs) for chunk in chunks]
+            if self._session is not None:
+                predictions = self._session.run_arrays(inputs)
+            else:
+                predictions = self._model.predict_arrays(inputs, **self._predict_kwargs)
             result_array = predictions.to_structured_array()
         except Exception as e:
-            logger.error(f"Error during BirdNET analysis of {audio_path}: {e}", exc_info=True)
-            os.remove(audio_path)  # Clean up temp file even on analysis error
+            logger.error(f"Error during BirdNET analysis of {len(chunks)} chunk(s): {e}", exc_info=True)
             return
 
-        detected_in_chunk = False
-        for row in result_array:
-            species = str(row['species_name'])
-            confidence = float(row['confidence'])
-            start_sec = self._parse_time_to_seconds(row['start_time'])
-            end_sec = self._parse_time_to_seconds(row['end_time'])
-
-            logger.info(f"Predicted '{species}' with confidence {confidence:.2f}")
-            if confidence > self.detection_threshold:
-                logger.info("Confidence is greater than detection threshold!")
-
-                # Create a BirdDetection object
-                detection_obj = BirdDetection(
-                    timestamp_utc=datetime.now(timezone.utc).isoformat(),  # Current UTC time
-                    chunk_interval_sec=(start_sec, end_sec),  # Tuple (start_sec, end_sec)
-                    species=species,
-                    confidence=confidence
-                )
-
-                # Put the BirdDetection object into the database write queue
-                # This is a non-blocking operation.
-                self._db_write_queue.put(detection_obj)
-                detected_in_chunk = True
-
-        if not detected_in_chunk:
-            logger.info(f"No strong predictions found for audio chunk {audio_path.name}.")
-
-        os.remove(audio_path)  # Clean up the temporary audio file after analysis
-
+        if chunk_times is None:
+            chunk_times = [datetime.now(timezone.utc).isoformat()] * len(chunks)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            for row in result_array:
+                logger.debug(f"Predicted '{row['species_name']}' with confidence {row['confidence']:.2f}")
+
+        # Threshold first so only confident rows are parsed and turned into detections
+        confident = result_array[result_array['confidence'] > self.detection_threshold]
+        start_secs = self._times_to_seconds(confident['start_time']).tolist()
+        end_secs = self._times_to_seconds(confident['end_time']).tolist()
+
+        chunk_indices = confident['input'].astype(np.intp)
+        detections = [
+            # Species names repeat across detections; intern them so every row shares one string
+            BirdDetection(chunk_times[i], start_sec, end_sec, sys.intern(str(species)), confidence)
+            for i, species, confidence, start_sec, end_sec in zip(
+                chunk_indices.tolist(), confident['species_name'], confident['confidence'].tolist(),
+                start_secs, end_secs)
+        ]
+
+        # Put the BirdDetection objects into the database write queue
+        # This is a non-blocking operation.
+        for detection_obj in detections:
+            self._db_write_queue.put(detection_obj)
+        if detections:
+            logger.info(f"Queued {len(detections)} detection(s) above the confidence threshold.")
+
+        # 'input' holds the index of the chunk within the batch each row belongs to
+        detected_in_chunk = np.zeros(len(chunks), dtype=bool)
+        detected_in_chunk[chunk_indices] = True
+        for i in np.flatnonzero(~detected_in_chunk):
+            logger.info(f"No strong predictions found for audio chunk {i + 1} of {len(chunks)}.")
 
     def run(self):
         """
@@ -253,6 +468,11 @@ class BirdListener:
         self._audio_process_thread.start()
         logger.info("Audio processing thread started.")
 
-        # 3. Start the audio input stream.
+        # 3. Start the chunk assembly thread (consumer of the audio ring buffer).
+        self._chunk_thread = threading.Thread(target=self._assemble_chunks, daemon=True)
+        self._chunk_thread.start()
+        logger.info("Chunk assembly thread started.")
+
+        # 4. Start the audio input stream.
         self.listen()
         logger.info("BirdListener's main 'run' method completed its setup phase (audio stream is active).")
@@ -1,10 +1,10 @@
 import logging
 import queue
 import threading
+import time
 import absl.logging
 absl.logging.set_verbosity(absl.logging.ERROR)
 import sqlite3
-from datetime import datetime
 
 
 logger = logging.getLogger(__name__)
@@ -13,27 +13,52 @@ logger = logging.getLogger(__name__)
 class DatabaseWriter:
     def __init__(self,
                  db_file: str,
-                 write_queue: queue.Queue,
+                 write_queue: queue.SimpleQueue,
                  batch_size: int = 100,
-                 flush_interval: int = 30
+                 flush_interval: int = 30,
+                 commit_every: int = 4,
+                 checkpoint_interval: float = None,
+                 max_retries: int = 3
                  ):
         self.db_file = db_file
         self.write_queue = write_queue # The queue to read from
+        # queue.SimpleQueue has no task tracking; only acknowledge items on queues that do
+        self._task_done = getattr(write_queue, "task_done", None)
         self.batch_size = batch_size   # How many detections to accumulate before writing
         self.flush_interval = flush_interval # How often to force a write even if batch_size not met
+        self.commit_every = commit_every # Full batches written per transaction while a backlog lasts
+        # How often the background thread folds the WAL back into the database file
+        self.checkpoint_interval = checkpoint_interval if checkpoint_interval is not None else flush_interval * 10
+        self._checkpoint_stop = threading.Event()
+        self._checkpoint_thread = None
+        self.max_retries = max_retries # Failed attempts to write busy/locked rows before dropping them
+        self._retries = 0
+        self._batches_since_commit = 0
+        self._uncommitted = [] # Rows written in the still open transaction
         self._running = False
         self._conn = None
         self._cursor = None
-        self._buffer = [] # Temporary buffer for accumulating detections
+        self._buffer = [] # Row tuples waiting to be written, in INSERT column order
 
     def _initialize_db(self):
         """Initializes the SQLite database connection and creates the table."""
         try:
             self._conn = sqlite3.connect(self.db_file, timeout=10) # Add a timeout for connection
+            self._conn.isolation_level = None # Manage transactions explicitly in _write_batch
             self._cursor = self._conn.cursor()
+            # WAL lets the dashboard read while we write; NORMAL sync is safe with WAL. Readers
+            # need write access to the database directory for the -wal/-shm files (see README)
+            self._cursor.execute("PRAGMA journal_mode=WAL")
+            # No inline checkpoint on the COMMIT that crosses the WAL size threshold;
+            # _run_checkpointer does it in the background instead
+            self._cursor.execute("PRAGMA wal_autocheckpoint=0")
+            self._cursor.execute("PRAGMA synchronous=NORMAL")
+            self._cursor.execute("PRAGMA temp_store=MEMORY")
+            self._cursor.execute("PRAGMA cache_size=-20000") # ~20 MB page cache
+            self._cursor.execute("PRAGMA mmap_size=268435456") # Read pages through a 256 MB memory map
             self._cursor.execute("""
                 CREATE TABLE IF NOT EXISTS detections (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id INTEGER PRIMARY KEY, -- rowid alias; no AUTOINCREMENT bookkeeping per insert
                     timestamp_utc TEXT NOT NULL,
                     chunk_start_sec REAL NOT NULL,
                     chunk_end_sec REAL NOT NULL,
@@ -41,71 +66,190 @@ class DatabaseWriter:
                     confidence REAL NOT NULL
                 )
             """)
-            self._conn.commit()
+            # The dashboard looks detections up by time: latest, by day and by week
+            self._cursor.execute("CREATE INDEX IF NOT EXISTS idx_detections_timestamp ON detections (timestamp_utc)")
+            self._insert_sql = ("INSERT INTO detections (timestamp_utc, chunk_start_sec, chunk_end_sec, species, confidence) "
+                                "VALUES (?, ?, ?, ?, ?)")
             logger.info(f"Database '{self.db_file}' initialized successfully.")
         except sqlite3.Error as e:
             logger.critical(f"Failed to initialize database: {e}")
             raise # Re-raise to stop the application if DB init fails
 
-    def _write_batch(self):
-        """Writes the accumulated detections from the buffer to the database."""
-        if not self._buffer:
+    def _add(self, detection):
+        """Converts a detection to its row tuple and buffers it for the next write."""
+        self._buffer.append((detection.timestamp_utc, detection.start_sec, detection.end_sec,
+                             detection.species, detection.confidence))
+
+    def _drain(self, limit=None) -> int:
+        """
+        Moves items that are already waiting in the queue into the buffer without
+        blocking, stopping once the buffer holds ``limit`` rows (no limit if None).
+        Returns the number of items taken.
+        """
+        taken = 0
+        while limit is None or len(self._buffer) < limit:
+            try:
+                self._add(self.write_queue.get_nowait())
+            except queue.Empty:
+                break
+            if self._task_done is not None:
+                self._task_done()
+            taken += 1
+        return taken
+
+    def _write_batch(self, defer_commit: bool = False):
+        """
+        Writes the accumulated detections from the buffer to the database.
+
+        Args:
+            defer_commit (bool): Leave the transaction open so that up to ``commit_every``
+                                 batches share one commit (and one fsync). Used while the
+                                 queue is backlogged; any other flush commits.
+        """
+        if not self._buffer and not self._uncommitted:
             return
 
         try:
-            self._cursor.executemany(
-                "INSERT INTO detections (timestamp_utc, chunk_start_sec, chunk_end_sec, species, confidence) VALUES (?, ?, ?, ?, ?)",
-                [(d.timestamp_utc, d.chunk_interval_sec[0], d.chunk_interval_sec[1], d.species, d.confidence)
-                 for d in self._buffer]
-            )
-            self._conn.commit()
-            logger.info(f"Successfully wrote {len(self._buffer)} detections to database.")
+            # One explicit transaction per flush (or per commit_every flushes), never one per row
+            if not self._conn.in_transaction:
+                self._cursor.execute("BEGIN IMMEDIATE")
+            self._cursor.executemany(self._insert_sql, self._buffer)
+            self._uncommitted.extend(self._buffer)
             self._buffer.clear() # Clear buffer after successful write
+            self._batches_since_commit += 1
+            if defer_commit and self._batches_since_commit < self.commit_every:
+                return
+            self._cursor.execute("COMMIT")
+            logger.info(f"Successfully wrote {len(self._uncommitted)} detections to database.")
+            self._uncommitted.clear()
+            self._batches_since_commit = 0
+            self._retries = 0
+        except sqlite3.Error as e:
+            if self._conn.in_transaction:
+                self._cursor.execute("ROLLBACK")
+            # Everything since the last commit is lost from the database
+            rows = self._uncommitted + self._buffer
+            self._uncommitted, self._buffer = [], []
+            self._batches_since_commit = 0
+            if self._is_transient(e):
+                self._retry_later(rows, e)
+            else:
+                logger.error(f"Failed to write batch to database: {e}. Writing its rows one at a time.")
+                self._write_rows_individually(rows)
+
+    @staticmethod
+    def _is_transient(error: sqlite3.Error) -> bool:
+        """True for errors that may pass on retry: the database is busy or locked."""
+        code = getattr(error, "sqlite_errorcode", None)
+        if code is not None:
+            return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+        return isinstance(error, sqlite3.OperationalError) and "locked" in str(error)
+
+    def _retry_later(self, rows, error):
+        """Keeps rows buffered for the next flush, dropping them after ``max_retries`` attempts."""
+        self._retries += 1
+        if self._retries > self.max_retries:
+            logger.error(f"Dropping {len(rows)} detections after {self._retries} failed write attempts: {error}")
+            self._retries = 0
+        else:
+            logger.warning(f"Database busy ({error}); keeping {len(rows)} detections for the next flush.")
+            self._buffer = rows
+
+    def _write_rows_individually(self, rows):
+        """
+        Writes rows one INSERT at a time in a single transaction, so rows the database
+        rejects (constraint violations, unsupported values) are dropped without losing
+        the rest of the batch.
+        """
+        try:
+            self._cursor.execute("BEGIN IMMEDIATE")
+            written = 0
+            for row in rows:
+                try:
+                    self._cursor.execute(self._insert_sql, row)
+                    written += 1
+                except (sqlite3.IntegrityError, sqlite3.InterfaceError) as e:
+                    logger.error(f"Dropping detection {row}: {e}")
+            self._cursor.execute("COMMIT")
+            logger.info(f"Successfully wrote {written} of {len(rows)} detections to database.")
+            self._retries = 0
         except sqlite3.Error as e:
-            logger.error(f"Failed to write batch to database: {e}")
-            # Depending on criticality, you might want to re-add items to queue or log them for later recovery
+            if self._conn.in_transaction:
+                self._cursor.execute("ROLLBACK")
+            self._retry_later(rows, e)
 
     def _run_writer_loop(self):
         """The main loop for the database writing thread."""
         self._initialize_db()
-        last_flush_time = datetime.now()
+        last_flush_time = time.monotonic()
 
         while self._running:
             try:
                 # Try to get items from the queue with a timeout
                 detection = self.write_queue.get(timeout=1) # Wait for 1 second
-                self._buffer.append(detection)
-                self.write_queue.task_done() # Mark task as done for join() later
+                self._add(detection)
+                if self._task_done is not None:
+                    self._task_done() # Mark task as done for join() later
+                # Take the rest of a backlog in one go instead of one wakeup per item
+                self._drain(self.batch_size)
 
                 # Check if batch size is met
                 if len(self._buffer) >= self.batch_size:
-                    self._write_batch()
-                    last_flush_time = datetime.now() # Reset timer after batch write
+                    self._write_batch(defer_commit=True)
+                    last_flush_time = time.monotonic() # Reset timer after batch write
 
             except queue.Empty:
-                # If no items in queue for a while, check flush interval
-                if (datetime.now() - last_flush_time).total_seconds() >= self.flush_interval:
+                # The queue went idle: commit a deferred transaction right away so the
+                # dashboard sees its rows, otherwise flush once the interval has passed
+                if self._uncommitted or time.monotonic() - last_flush_time >= self.flush_interval:
                     self._write_batch()
-                    last_flush_time = datetime.now()
+                    last_flush_time = time.monotonic()
             except Exception as e:
                 logger.error(f"Error in DatabaseWriter loop: {e}")
 
-        # After the loop, write any remaining items in the buffer
+        # After the loop, pick up whatever is still queued and write the remaining buffer
+        self._drain()
         self._write_batch()
         if self._conn:
+            try:
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)") # Leave an empty WAL behind
+            except sqlite3.Error as e:
+                logger.warning(f"Final WAL checkpoint failed: {e}")
             self._conn.close()
             logger.info("Database connection closed.")
 
+    def _run_checkpointer(self):
+        """
+        Periodically runs a PASSIVE WAL checkpoint, which copies committed pages into the
+        database file without blocking the writer or the dashboard's readers. Uses its
+        own connection, as sqlite3 connections stay on the thread that opened them.
+        """
+        conn = None
+        while not self._checkpoint_stop.wait(self.checkpoint_interval):
+            try:
+                if conn is None:
+                    conn = sqlite3.connect(self.db_file, timeout=10)
+                conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            except sqlite3.Error as e:
+                logger.warning(f"WAL checkpoint failed: {e}")
+        if conn is not None:
+            conn.close()
+
     def start(self):
-        """Starts the database writing thread."""
+        """Starts the database writing and checkpointing threads."""
         self._running = True
         self._thread = threading.Thread(target=self._run_writer_loop, daemon=True)
         self._thread.start()
+        self._checkpoint_stop.clear()
+        self._checkpoint_thread = threading.Thread(target=self._run_checkpointer, daemon=True)
+        self._checkpoint_thread.start()
         logger.info("DatabaseWriter thread started.")
 
     def stop(self):
         """Stops the database writing thread and flushes remaining data."""
         self._running = False
+        self._checkpoint_stop.set()
+        self._checkpoint_thread.join(timeout=5)
         # Give the thread a chance to process remaining queue items and buffer
         self._thread.join(timeout=self.flush_interval + 5) # Wait a bit longer than flush interval
         logger.info("DatabaseWriter thread stopped.")
\ No newline at end of file
@@ -1,14 +1,44 @@
-class BirdDetection:
-    __slots__ = ('timestamp_utc', 'chunk_interval_sec', 'species', 'confidence')
+from typing import NamedTuple
 
-    def __init__(self, timestamp_utc, chunk_interval_sec, species, confidence):
-        self.timestamp_utc = timestamp_utc
-        self.chunk_interval_sec = chunk_interval_sec
-        self.species = species
-        self.confidence = confidence
+_tuple_new = tuple.__new__
+
+
+class _DetectionFields(NamedTuple):
+    timestamp_utc: str
+    start_sec: float
+    end_sec: float
+    species: str
+    confidence: float
+
+
+class BirdDetection(_DetectionFields):
+    """
+    A single BirdNET detection. Being a flat tuple, it is cheap to construct and can
+    be passed to the database as-is or unpacked by field.
+
+    The window can be given as ``start_sec, end_sec`` or, as before, as one
+    ``(start_sec, end_sec)`` tuple, positionally or as ``chunk_interval_sec=``.
+    """
+    __slots__ = ()
+
+    def __new__(cls, timestamp_utc, start_sec=None, end_sec=None, species=None, confidence=None,
+                chunk_interval_sec=None):
+        # Builds the tuple directly, so this costs no more than the generated NamedTuple __new__
+        if chunk_interval_sec is not None:
+            start_sec, end_sec = chunk_interval_sec
+        elif type(start_sec) is tuple:
+            if end_sec is not None:  # Species passed positionally after the interval
+                species, confidence = end_sec, (species if confidence is None else confidence)
+            start_sec, end_sec = start_sec
+        return _tuple_new(cls, (timestamp_utc, start_sec, end_sec, species, confidence))
+
+    @property
+    def chunk_interval_sec(self) -> tuple:
+        """(start_sec, end_sec) of the detection within its chunk."""
+        return self.start_sec, self.end_sec
 
     def __repr__(self):
         return (f"BirdDetection(species='{self.species}', "
                 f"confidence={self.confidence:.2f}, "
                 f"interval={self.chunk_interval_sec}, "
-                f"time='{self.timestamp_utc}')")
\ No newline at end of file
+                f"time='{self.timestamp_utc}')")
@@ -0,0 +1,61 @@
+import numpy as np
+from birdcode._fastbuf import push_samples, pop_samples, WRITE, READ, DROPPED
+
+
+class RingBuffer:
+    """
+    Single-producer/single-consumer ring buffer of audio samples (float32 or int16).
+
+    The producer (the PortAudio callback) only ever advances the write counter and
+    the consumer (the chunk assembly thread) only ever advances the read counter, so
+    neither side takes a lock. Counters grow monotonically and are masked into the
+    power-of-two sized storage on access. The copy kernels are JIT-compiled with
+    Numba when it is installed.
+    """
+
+    def __init__(self, capacity: int, dtype='float32'):
+        """
+        Args:
+            capacity (int): Minimum number of samples the buffer must hold. Rounded
+                            up to the next power of two.
+            dtype: Sample type stored in the buffer.
+        """
+        self.size = 1 << max(capacity - 1, 1).bit_length()
+        self._data = np.zeros(self.size, dtype=dtype)
+        self._state = np.zeros(3, dtype=np.int64)  # [write count, read count, dropped]
+
+    @property
+    def read_available(self) -> int:
+        return int(self._state[WRITE] - self._state[READ])
+
+    @property
+    def write_available(self) -> int:
+        return self.size - self.read_available
+
+    @property
+    def dropped(self) -> int:
+        """Samples discarded because the consumer fell behind."""
+        return int(self._state[DROPPED])
+
+    def write(self, samples: np.ndarray) -> int:
+        """
+        Copies as many samples as fit into the buffer. Never blocks; samples that do
+        not fit are counted in ``dropped``. Returns the number of samples written.
+        """
+        return push_samples(self._data, self._state, samples)
+
+    def writer(self) -> tuple:
+        """
+        Returns ``(push, data, state)``, the write kernel and the arrays it takes
+        besides the samples: ``push(data, state, samples)`` does the same as
+        ``write(samples)``. Lets a hot producer bind them once instead of
+        looking them up on every call.
+        """
+        return push_samples, self._data, self._state
+
+    def readinto(self, out: np.ndarray) -> int:
+        """
+        Moves up to ``len(out)`` samples from the buffer into ``out``.
+        Returns the number of samples read.
+        """
+        return pop_samples(self._data, self._state, out)
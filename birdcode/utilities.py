@@ -1,52 +1,195 @@
+import atexit
+import functools
 import logging
-import json
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
 from pathlib import Path
 
+try:
+    from orjson import loads as _json_loads  # Optional, faster JSON parser
+except ImportError:
+    from json import loads as _json_loads
+
+
+# Background thread that writes log records to the file and console handlers, and the
+# root logger handler that feeds it
+_listener = None
+_queue_handler = None
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    FileHandler that lets records collect in the file buffer instead of flushing
+    after every record. The buffer is written out as soon as a record at
+    ``flush_level`` or above arrives, when the handler is closed, and otherwise by a
+    timer at most ``flush_interval`` seconds after the first unflushed record, so
+    the tail of a burst does not wait for the next record.
+    """
+
+    def __init__(self, filename, flush_interval: float = 5.0, flush_level: int = logging.WARNING,
+                 buffer_size: int = 65536, **kwargs):
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        self.buffer_size = buffer_size
+        self._last_flush = time.monotonic()
+        self._flush_timer = None  # Pending timed flush while records sit in the buffer
+        super().__init__(filename, **kwargs)
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= self.flush_level or time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        with self.lock:
+            super().flush()
+            self._last_flush = time.monotonic()
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+
+class FastFormatter(logging.Formatter):
+    """
+    Formatter that renders the timestamp once per second instead of once per record.
+    Only an explicit ``datefmt`` is cached: it has one-second resolution, whereas the
+    default time format includes milliseconds.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cached_time = (None, '')  # (second, formatted time), swapped as one object
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt is None:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, formatted = self._cached_time
+        if second != cached_second:
+            formatted = super().formatTime(record, datefmt)
+            self._cached_time = (second, formatted)
+        return formatted
+
 
 def configure_logging(output_dir: str = None):
+    global _listener, _queue_handler
     log_format = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
     date_format = '%Y-%m-%d %H:%M:%S'
 
-    log_dir = Path(output_dir) if output_dir else Path.cwd()
-    log_dir.mkdir(parents=True, exist_ok=True)
-
-    log_file_path = log_dir / "BirdListener.log"
+    log_dir = output_dir or os.getcwd()
+    log_file_path = os.path.join(log_dir, "BirdListener.log")
 
     # Get root logger
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
 
+    # Already logging to this file: keep the open handlers and their buffered records
+    if (_listener is not None and _queue_handler in logger.handlers
+            and _listener.handlers[0].baseFilename == os.path.abspath(log_file_path)):
+        return
+
+    # One mkdir() call when the directory is new or already there; parents only if needed
+    try:
+        os.mkdir(log_dir)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        os.makedirs(log_dir, exist_ok=True)
+
     # Clear any existing handlers
     if logger.hasHandlers():
         logger.handlers.clear()
+    _reset_logging()
 
-    # File handler
-    file_handler = logging.FileHandler(log_file_path, encoding='utf-8')
-    file_handler.setFormatter(logging.Formatter(log_format, datefmt=date_format))
-    logger.addHandler(file_handler)
+    formatter = FastFormatter(log_format, datefmt=date_format)
+
+    # File handler, buffered so routine records don't cost a write() each
+    file_handler = BufferedFileHandler(log_file_path, encoding='utf-8')
+    file_handler.setFormatter(formatter)
 
     # Console handler
     console_handler = logging.StreamHandler()
-    console_handler.setFormatter(logging.Formatter(log_format, datefmt=date_format))
-    logger.addHandler(console_handler)
+    console_handler.setFormatter(formatter)
 
-    # Suppress absl logging messages to reduce verbosity from TensorFlow/BirdNET
-    try:
-        import absl.logging
-        absl.logging.set_verbosity(absl.logging.ERROR)
-        logging.getLogger('tensorflow').setLevel(logging.ERROR)
-        logging.getLogger('h5py').setLevel(logging.ERROR)
-    except ImportError:
-        pass
+    # Logging threads only merge the message arguments (QueueHandler.prepare) and enqueue
+    # the record; a listener thread applies the handlers' formatters and does the I/O
+    log_queue = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    logger.addHandler(_queue_handler)
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler,
+                                               respect_handler_level=True)
+    _listener.start()
+
+    # Suppress log messages to reduce verbosity from TensorFlow/BirdNET. absl is only
+    # touched if something has already imported it, so this never pulls it in.
+    absl_logging = sys.modules.get('absl.logging')
+    if absl_logging is not None:
+        absl_logging.set_verbosity(absl_logging.ERROR)
+    logging.getLogger('tensorflow').setLevel(logging.ERROR)
+    logging.getLogger('h5py').setLevel(logging.ERROR)
 
     logger.info(f"Logging configured. Logs will be written to: {log_file_path}")
 
 
+def _reset_logging():
+    """
+    Tears down what configure_logging set up: detaches the queue handler and stops
+    the listener thread, writing out the records still queued.
+    """
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(_reset_logging)
+
+
+def _read_config(path: str) -> dict:
+    with open(path, "rb") as f:
+        return _json_loads(f.read())
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_config(path: str, mtime_ns: int) -> dict:
+    # Keyed on the modification time, so an edited file is read again
+    return _read_config(path)
+
+
 def get_config(path: Path) -> dict:
     if not path.exists():
         logging.warning(f"Config file not found. Using default configurations.")
         path=Path.cwd() / "config" / "config.json"
 
-    with open(path, "r") as f:
-        data = json.load(f)
-    return data
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return _read_config(str(path))  # Not cacheable; let open() report the problem
+    # Keyed on the absolute path, so a relative path read from another working
+    # directory cannot hit this file's entry. Callers get their own copy so they
+    # cannot change the cached one
+    return dict(_cached_config(str(Path(path).resolve()), mtime_ns))
@@ -54,6 +54,33 @@ def parse_species(species_raw):
     return {"scientific_name": species_raw, "common_name": species_raw}
 
 
+def prefix_bounds(prefix):
+    """
+    Return (low, high) such that ``low <= value < high`` holds exactly for the strings
+    starting with ``prefix``. Unlike ``LIKE 'prefix%'``, the range lets SQLite use the
+    timestamp index.
+    """
+    return prefix, prefix + "\uffff"
+
+
+def iso_hour(ts):
+    """
+    Hour of an ISO 8601 timestamp ('YYYY-MM-DDTHH:MM:SS...'), read straight from its
+    fixed position instead of building a datetime. Returns None if ``ts`` is malformed.
+    """
+    if not isinstance(ts, str) or len(ts) < 19 or ts[10] not in "T " or ts[13] != ":":
+        return None
+    hour = ts[11:13]
+    return int(hour) if hour.isdigit() else None
+
+
+def iso_day(ts):
+    """Date part ('YYYY-MM-DD') of an ISO 8601 timestamp, or None if ``ts`` is malformed."""
+    if not isinstance(ts, str) or len(ts) < 10 or ts[4] != "-" or ts[7] != "-":
+        return None
+    return ts[:10]
+
+
 # ---------------------------------------------------------------------------
 # Pages
 # ---------------------------------------------------------------------------
@@ -167,8 +194,8 @@ def api_detections():
         params = []
 
         if date_str:
-            query += " AND timestamp_utc LIKE ?"
-            params.append(f"{date_str}%")
+            query += " AND timestamp_utc >= ? AND timestamp_utc < ?"
+            params.extend(prefix_bounds(date_str))
 
         if species_filter:
             query += " AND species LIKE ?"
@@ -265,9 +292,9 @@ def api_stats_daily():
         cursor.execute(
             """SELECT species, timestamp_utc
                FROM detections
-               WHERE timestamp_utc LIKE ?
+               WHERE timestamp_utc >= ? AND timestamp_utc < ?
                ORDER BY timestamp_utc""",
-            (f"{date_str}%",)
+            prefix_bounds(date_str)
         )
         rows = cursor.fetchall()
         conn.close()
@@ -276,10 +303,8 @@ def api_stats_daily():
         species_hours = {}  # { species_raw: { hour: count } }
         for r in rows:
             sp_raw = r["species"]
-            ts = r["timestamp_utc"]
-            try:
-                hour = datetime.fromisoformat(ts).hour
-            except (ValueError, TypeError):
+            hour = iso_hour(r["timestamp_utc"])
+            if hour is None:
                 continue
 
             if sp_raw not in species_hours:
@@ -352,10 +377,8 @@ def api_stats_weekly():
         species_days = {}  # { species_raw: { date_str: count } }
         for r in rows:
             sp_raw = r["species"]
-            ts = r["timestamp_utc"]
-            try:
-                day_str = datetime.fromisoformat(ts).strftime("%Y-%m-%d")
-            except (ValueError, TypeError):
+            day_str = iso_day(r["timestamp_utc"])
+            if day_str is None:
                 continue
 
             if sp_raw not in species_days:
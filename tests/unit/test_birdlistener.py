@@ -2,8 +2,9 @@ import unittest
 from unittest.mock import patch, MagicMock, call
 import numpy as np
 import queue
-from pathlib import Path
-from birdcode.birdlistener import BirdListener
+import sys
+from datetime import datetime
+from birdcode.birdlistener import BirdListener, _get_model
 
 class TestBirdListener(unittest.TestCase):
     def setUp(self):
@@ -15,6 +16,7 @@ class TestBirdListener(unittest.TestCase):
             "detection_threshold": 0.5
         }
         self.db_file = ":memory:"
+        _get_model.cache_clear()
 
     @patch("birdcode.birdlistener.birdnet")
     @patch("birdcode.birdlistener.DatabaseWriter")
@@ -31,10 +33,47 @@ class TestBirdListener(unittest.TestCase):
         self.assertEqual(bl.audio_buffer.shape, (8000,))
         self.assertEqual(bl.audio_buffer.dtype, np.float32)
         self.assertEqual(bl._buffer_pos, 0)
-        self.assertIsInstance(bl._audio_chunk_queue, queue.Queue)
-        self.assertIsInstance(bl._db_write_queue, queue.Queue)
+        self.assertIsInstance(bl._audio_chunk_queue, queue.SimpleQueue)
+        self.assertIsInstance(bl._db_write_queue, queue.SimpleQueue)
         mock_db_writer.assert_called_once_with(self.db_file, bl._db_write_queue)
 
+    @patch("birdcode.birdlistener.birdnet")
+    @patch("birdcode.birdlistener.DatabaseWriter")
+    def test_init_loads_configured_model(self, mock_db_writer, mock_birdnet):
+        BirdListener(self.db_file, dict(self.config, model_precision="int8", model_library="litert"))
+        mock_birdnet.load.assert_called_once_with("acoustic", "2.4", "tf", precision="int8", library="litert")
+
+        mock_birdnet.load.reset_mock()
+        BirdListener(self.db_file, dict(self.config, model_backend="pb"))
+        mock_birdnet.load.assert_called_once_with("acoustic", "2.4", "pb", precision="fp32")
+
+    @patch("birdcode.birdlistener.birdnet")
+    @patch("birdcode.birdlistener.DatabaseWriter")
+    def test_init_sets_inference_parallelism(self, mock_db_writer, mock_birdnet):
+        bl = BirdListener(self.db_file, dict(self.config, inference_workers=3, inference_batch_size=8))
+        self.assertEqual(bl._predict_kwargs["n_workers"], 3)
+        self.assertEqual(bl._predict_kwargs["batch_size"], 8)
+
+        with patch("birdcode.birdlistener.os.cpu_count", return_value=16):
+            bl = BirdListener(self.db_file, self.config)
+        self.assertEqual(bl._predict_kwargs["n_workers"], 4)
+
+    @patch("birdcode.birdlistener.birdnet")
+    @patch("birdcode.birdlistener.DatabaseWriter")
+    def test_model_loaded_once_per_process(self, mock_db_writer, mock_birdnet):
+        first = BirdListener(self.db_file, self.config)
+        second = BirdListener(self.db_file, self.config)
+        mock_birdnet.load.assert_called_once()
+        self.assertIs(first._model, second._model)
+
+    @patch("birdcode.birdlistener.gc.freeze")
+    @patch("birdcode.birdlistener.birdnet")
+    @patch("birdcode.birdlistener.DatabaseWriter")
+    def test_gc_frozen_once_after_model_load(self, mock_db_writer, mock_birdnet, mock_freeze):
+        BirdListener(self.db_file, self.config)
+        BirdListener(self.db_file, self.config)
+        mock_freeze.assert_called_once()
+
     @patch("birdcode.birdlistener.birdnet")
     @patch("birdcode.birdlistener.sd.InputStream")
     @patch("birdcode.birdlistener.DatabaseWriter")
@@ -47,19 +86,91 @@ class TestBirdListener(unittest.TestCase):
         mock_stream.start.assert_called_once()
 
     @patch("birdcode.birdlistener.birdnet")
-    @patch("birdcode.birdlistener.sf.write")
-    @patch("birdcode.birdlistener.tempfile.NamedTemporaryFile")
+    @patch("birdcode.birdlistener.sd.InputStream")
+    @patch("birdcode.birdlistener.DatabaseWriter")
+    def test_listen_rtmixer_backend(self, mock_db_writer, mock_input_stream, mock_birdnet):
+        bl = BirdListener(self.db_file, dict(self.config, audio_backend="rtmixer"))
+        mock_rtmixer = MagicMock()
+        with patch.dict("sys.modules", {"rtmixer": mock_rtmixer}):
+            bl.listen()
+        mock_input_stream.assert_not_called()
+        recorder = mock_rtmixer.Recorder.return_value
+        recorder.start.assert_called_once()
+        recorder.record_ringbuffer.assert_called_once_with(mock_rtmixer.RingBuffer.return_value, channels=[1])
+        self.assertIs(bl._ring, mock_rtmixer.RingBuffer.return_value)
+
+        recorder.active = True
+        bl._db_writer = MagicMock()
+        bl.stop()
+        recorder.cancel.assert_called_once_with(recorder.record_ringbuffer.return_value)
+        recorder.close.assert_called_once()
+
+    @patch("birdcode.birdlistener.birdnet")
     @patch("birdcode.birdlistener.DatabaseWriter")
-    def test_save_chunk_to_queue(self, mock_db_writer, mock_tempfile, mock_sf_write, mock_birdnet):
+    def test_callback_queues_full_chunk(self, mock_db_writer, mock_birdnet):
         bl = BirdListener(self.db_file, self.config)
-        mock_file = MagicMock()
-        mock_file.name = "temp.wav"
-        mock_tempfile.return_value.__enter__.return_value = mock_file
-        arr = np.zeros((bl.chunk_samples, 1), dtype='float32')
-        bl._save_chunk_to_queue(arr)
-        mock_sf_write.assert_called_once_with("temp.wav", arr, bl.fs)
+        block = np.ones((bl.blocksize, 1), dtype='float32')
+        # 8000 samples per chunk / 256 per block -> the 32nd block fills the chunk
+        for _ in range(32):
+            bl._callback(block, bl.blocksize, None, None)
+        self.assertTrue(bl._audio_chunk_queue.empty())  # Callback only fills the ring buffer
+        self.assertEqual(bl._ring.read_available, 32 * bl.blocksize)
+
+        while bl._drain_ring():
+            pass
         self.assertFalse(bl._audio_chunk_queue.empty())
-        self.assertEqual(bl._audio_chunk_queue.get(), "temp.wav")
+        idx, chunk, stamp = bl._audio_chunk_queue.get()
+        self.assertIs(chunk, bl._chunk_pool[idx])  # Queued without copying
+        self.assertIsNotNone(datetime.fromisoformat(stamp).tzinfo)  # Stamped when completed
+        self.assertIsInstance(chunk, np.ndarray)
+        self.assertEqual(chunk.shape, (bl.chunk_samples,))
+        self.assertEqual(chunk.dtype, np.float32)
+        self.assertEqual(bl._buffer_pos, 192)  # Leftover of the last block starts the next chunk
+
+    @patch("birdcode.birdlistener.birdnet")
+    @patch("birdcode.birdlistener.DatabaseWriter")
+    def test_silent_chunk_is_not_queued(self, mock_db_writer, mock_birdnet):
+        bl = BirdListener(self.db_file, dict(self.config, vad_rms_threshold=0.01))
+        bl._ring.write(np.full(bl.chunk_samples, 0.001, dtype='float32'))
+        bl._drain_ring()
+        self.assertTrue(bl._audio_chunk_queue.empty())
+        self.assertIsNotNone(bl.audio_buffer)  # Pool buffer is reused straight away
+
+        bl._ring.write(np.full(bl.chunk_samples, 0.5, dtype='float32'))
+        bl._drain_ring()
+        self.assertEqual(bl._audio_chunk_queue.qsize(), 1)
+        self.assertFalse(bl._backlogged)
+
+    @patch("birdcode.birdlistener.birdnet")
+    @patch("birdcode.birdlistener.DatabaseWriter")
+    def test_chunk_pool_recycles_buffers(self, mock_db_writer, mock_birdnet):
+        bl = BirdListener(self.db_file, dict(self.config, chunk_pool_size=2))
+        block = np.ones(bl.chunk_samples, dtype='float32')
+        for _ in range(3):
+            bl._ring.write(block)
+            while bl._drain_ring():
+                pass
+        # Both pool buffers are queued; the third chunk waits in the ring buffer
+        self.assertEqual(bl._audio_chunk_queue.qsize(), 2)
+        self.assertEqual(bl._ring.read_available, bl.chunk_samples)
+        self.assertTrue(bl._backlogged)
+
+        bl.analyze_batch = MagicMock()
+        bl._running = True
+        bl.batch_timeout_ms = 10
+
+        def stop_after_batch(chunks, chunk_times):
+            bl._running = False
+        bl.analyze_batch.side_effect = stop_after_batch
+        bl.pin_inference_cores = False  # Runs on the test thread
+        bl._process_audio()
+        self.assertEqual(len(bl.analyze_batch.call_args[0][0]), 2)
+
+        # Recycled buffers let the pending chunk through
+        while bl._drain_ring():
+            pass
+        self.assertEqual(bl._audio_chunk_queue.qsize(), 1)
+        self.assertFalse(bl._backlogged)
 
     @patch("birdcode.birdlistener.birdnet")
     @patch("birdcode.birdlistener.BirdDetection")
@@ -67,29 +178,180 @@ class TestBirdListener(unittest.TestCase):
     def test_analyze_detects_and_queues(self, mock_db_writer, mock_bird_detection, mock_birdnet):
         bl = BirdListener(self.db_file, self.config)
         bl.detection_threshold = 0.1  # Lower for test
-        audio_path = Path("fake.wav")
+        audio = np.zeros(bl.chunk_samples, dtype='float32')
 
         # Build a mock structured array matching birdnet 0.2.x output
         mock_result_array = np.array(
-            [("fake.wav", "00:00:00.00", "00:00:03.00", "Sparrow", 0.9)],
+            [(0, 0.0, 3.0, "Sparrow", 0.9)],
             dtype=[
-                ("file_path", "U256"), ("start_time", "U16"),
-                ("end_time", "U16"), ("species_name", "U256"),
+                ("input", "u1"), ("start_time", "f8"),
+                ("end_time", "f8"), ("species_name", "O"),
                 ("confidence", "f4"),
             ],
         )
         mock_predictions = MagicMock()
         mock_predictions.to_structured_array.return_value = mock_result_array
         bl._model = MagicMock()
-        bl._model.predict.return_value = mock_predictions
+        bl._model.predict_arrays.return_value = mock_predictions
 
         mock_detection_obj = MagicMock()
         mock_bird_detection.return_value = mock_detection_obj
-        with patch("os.remove") as mock_remove:
-            bl.analyze(audio_path)
-            self.assertFalse(bl._db_write_queue.empty())
-            self.assertIs(bl._db_write_queue.get(), mock_detection_obj)
-            mock_remove.assert_called_once_with(audio_path)
+        bl.analyze(audio)
+        self.assertFalse(bl._db_write_queue.empty())
+        self.assertIs(bl._db_write_queue.get(), mock_detection_obj)
+        bl._model.predict_arrays.assert_called_once()
+        self.assertIs(bl._model.predict_arrays.call_args[0][0][0][0], audio)
+
+    @patch("birdcode.birdlistener.birdnet")
+    @patch("birdcode.birdlistener.DatabaseWriter")
+    def test_analyze_batch_single_model_call(self, mock_db_writer, mock_birdnet):
+        bl = BirdListener(self.db_file, self.config)
+        chunks = [np.zeros(bl.chunk_samples, dtype='float32') for _ in range(3)]
+
+        # Only the second chunk of the batch has a detection above threshold
+        mock_result_array = np.array(
+            [(1, 3.0, 6.0, "Robin", 0.8), (2, 0.0, 3.0, "Robin", 0.2)],
+            dtype=[
+                ("input", "u1"), ("start_time", "f8"),
+                ("end_time", "f8"), ("species_name", "O"),
+                ("confidence", "f4"),
+            ],
+        )
+        bl._model = MagicMock()
+        bl._model.predict_arrays.return_value.to_structured_array.return_value = mock_result_array
+
+        bl.analyze_batch(chunks)
+
+        bl._model.predict_arrays.assert_called_once()
+        inputs = bl._model.predict_arrays.call_args[0][0]
+        self.assertEqual(len(inputs), 3)
+        self.assertEqual(inputs[0][0].shape, (bl.chunk_samples,))
+        self.assertEqual(inputs[0][1], bl.fs)
+        detection = bl._db_write_queue.get_nowait()
+        self.assertEqual(detection.species, "Robin")
+        self.assertIs(detection.species, sys.intern("Robin"))
+        self.assertEqual(detection.chunk_interval_sec, (3.0, 6.0))
+        self.assertTrue(bl._db_write_queue.empty())
+
+    @patch("birdcode.birdlistener.birdnet")
+    @patch("birdcode.birdlistener.DatabaseWriter")
+    def test_int16_samples_decoded_for_analysis(self, mock_db_writer, mock_birdnet):
+        bl = BirdListener(self.db_file, dict(self.config, sample_format="int16", vad_rms_threshold=0.1))
+        self.assertEqual(bl.audio_buffer.dtype, np.int16)
+        self.assertEqual(bl._ring._data.dtype, np.int16)
+
+        bl._ring.write(np.full(bl.chunk_samples, 16384, dtype='int16'))  # RMS 0.5 of full scale
+        while bl._drain_ring():
+            pass
+        idx, chunk, _ = bl._audio_chunk_queue.get_nowait()
+        self.assertEqual(chunk.dtype, np.int16)
+
+        bl._model = MagicMock()
+        bl._model.predict_arrays.return_value.to_structured_array.return_value = np.array(
+            [], dtype=[("input", "u1"), ("start_time", "f8"), ("end_time", "f8"),
+                       ("species_name", "O"), ("confidence", "f4")])
+        bl.analyze_batch([chunk])
+        audio, fs = bl._model.predict_arrays.call_args[0][0][0]
+        self.assertEqual(audio.dtype, np.float32)
+        np.testing.assert_allclose(audio, 0.5)
+
+    @patch("birdcode.birdlistener.birdnet")
+    @patch("birdcode.birdlistener.DatabaseWriter")
+    def test_unsupported_sample_format_rejected(self, mock_db_writer, mock_birdnet):
+        with self.assertRaises(ValueError):
+            BirdListener(self.db_file, dict(self.config, sample_format="int32"))
+
+    @patch("birdcode.birdlistener.birdnet")
+    @patch("birdcode.birdlistener.DatabaseWriter")
+    def test_analyze_batch_stamps_each_chunk(self, mock_db_writer, mock_birdnet):
+        bl = BirdListener(self.db_file, self.config)
+        chunks = [np.zeros(bl.chunk_samples, dtype='float32') for _ in range(2)]
+        mock_result_array = np.array(
+            [(0, 0.0, 3.0, "Robin", 0.9), (1, 0.0, 3.0, "Robin", 0.9)],
+            dtype=[
+                ("input", "u1"), ("start_time", "f8"),
+                ("end_time", "f8"), ("species_name", "O"),
+                ("confidence", "f4"),
+            ],
+        )
+        bl._model = MagicMock()
+        bl._model.predict_arrays.return_value.to_structured_array.return_value = mock_result_array
+
+        chunk_times = ["2025-08-04T12:00:03+00:00", "2025-08-04T12:05:00+00:00"]  # A gap between them
+        bl.analyze_batch(chunks, chunk_times)
+
+        self.assertEqual(bl._db_write_queue.get_nowait().timestamp_utc, chunk_times[0])
+        self.assertEqual(bl._db_write_queue.get_nowait().timestamp_utc, chunk_times[1])
+
+    @patch("birdcode.birdlistener.birdnet")
+    @patch("birdcode.birdlistener.DatabaseWriter")
+    def test_process_audio_reuses_prediction_session(self, mock_db_writer, mock_birdnet):
+        bl = BirdListener(self.db_file, dict(self.config, inference_workers=2))
+        bl._model = MagicMock()
+        session = bl._model.predict_session.return_value.__enter__.return_value
+        empty = np.array([], dtype=[("input", "u1"), ("start_time", "f8"), ("end_time", "f8"),
+                                    ("species_name", "O"), ("confidence", "f4")])
+
+        def run_arrays(inputs):
+            if bl._audio_chunk_queue.empty():
+                bl._running = False  # Stop after the queued chunks are analyzed
+            return MagicMock(**{"to_structured_array.return_value": empty})
+        session.run_arrays.side_effect = run_arrays
+
+        for _ in range(2):
+            idx = bl._free_chunks.get()
+            bl._audio_chunk_queue.put((idx, bl._chunk_pool[idx], "2025-08-04T12:00:00+00:00"))
+        bl.batch_size = 1
+        bl._running = True
+        bl.pin_inference_cores = False  # Runs on the test thread
+        bl._process_audio()
+
+        bl._model.predict_session.assert_called_once()
+        self.assertEqual(bl._model.predict_session.call_args.kwargs["n_workers"], 2)
+        self.assertEqual(session.run_arrays.call_count, 2)
+        bl._model.predict_arrays.assert_not_called()
+        self.assertIsNone(bl._session)
+
+    @patch("birdcode.birdlistener.birdnet")
+    @patch("birdcode.birdlistener.DatabaseWriter")
+    def test_process_audio_falls_back_without_session(self, mock_db_writer, mock_birdnet):
+        bl = BirdListener(self.db_file, self.config)
+        bl._model = MagicMock()
+        bl._model.predict_session.side_effect = RuntimeError("no session")
+        empty = np.array([], dtype=[("input", "u1"), ("start_time", "f8"), ("end_time", "f8"),
+                                    ("species_name", "O"), ("confidence", "f4")])
+
+        def predict_arrays(inputs, **kwargs):
+            bl._running = False
+            return MagicMock(**{"to_structured_array.return_value": empty})
+        bl._model.predict_arrays.side_effect = predict_arrays
+
+        idx = bl._free_chunks.get()
+        bl._audio_chunk_queue.put((idx, bl._chunk_pool[idx], "2025-08-04T12:00:00+00:00"))
+        bl._running = True
+        bl.pin_inference_cores = False  # Runs on the test thread
+        bl._process_audio()
+
+        bl._model.predict_arrays.assert_called_once()
+        self.assertTrue(bl._audio_chunk_queue.empty())
+
+    @patch("birdcode.birdlistener.os.sched_setaffinity", create=True)
+    @patch("birdcode.birdlistener.os.sched_getaffinity", create=True, return_value={0, 1, 2, 3})
+    def test_pin_to_inference_cores_leaves_first_core(self, mock_getaffinity, mock_setaffinity):
+        BirdListener._pin_to_inference_cores()
+        mock_setaffinity.assert_called_once_with(0, {1, 2, 3})
+
+        mock_setaffinity.reset_mock()
+        mock_getaffinity.return_value = {0}
+        BirdListener._pin_to_inference_cores()
+        mock_setaffinity.assert_not_called()
+
+    def test_times_to_seconds(self):
+        strings = np.array(["00:00:03.00", "01:02:03.50"], dtype="U16")
+        np.testing.assert_allclose(BirdListener._times_to_seconds(strings), [3.0, 3723.5])
+        numbers = np.array([0.0, 3.0], dtype="f4")
+        np.testing.assert_allclose(BirdListener._times_to_seconds(numbers), [0.0, 3.0])
+        self.assertEqual(BirdListener._times_to_seconds(np.array([], dtype="U16")).shape, (0,))
 
     @patch("birdcode.birdlistener.birdnet")
     @patch("birdcode.birdlistener.DatabaseWriter")
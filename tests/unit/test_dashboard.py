@@ -102,6 +102,30 @@ class TestParseSpecies:
 # API endpoint tests
 # ---------------------------------------------------------------------------
 
+class TestPrefixBounds:
+    def test_bounds_match_prefix_only(self):
+        from dashboard.app import prefix_bounds
+        low, high = prefix_bounds("2025-08-05")
+        assert low <= "2025-08-05T00:00:00+00:00" < high
+        assert low <= "2025-08-05T23:59:59.999999+00:00" < high
+        assert not (low <= "2025-08-04T23:59:59+00:00" < high)
+        assert not (low <= "2025-08-06T00:00:00+00:00" < high)
+
+
+class TestIsoFastPath:
+    def test_iso_hour(self):
+        from dashboard.app import iso_hour
+        assert iso_hour("2025-08-05T07:30:00+00:00") == 7
+        assert iso_hour("2025-08-05T23:59:59Z") == 23
+        assert iso_hour("2025-08-05") is None
+        assert iso_hour(None) is None
+
+    def test_iso_day(self):
+        from dashboard.app import iso_day
+        assert iso_day("2025-08-05T07:30:00+00:00") == "2025-08-05"
+        assert iso_day("garbage") is None
+
+
 class TestIndexRoute:
     def test_index_returns_html(self, client):
         resp = client.get("/")
@@ -6,7 +6,7 @@ from birdcode.database import DatabaseWriter
 class DummyDetection:
     def __init__(self, timestamp_utc, chunk_interval_sec, species, confidence):
         self.timestamp_utc = timestamp_utc
-        self.chunk_interval_sec = chunk_interval_sec
+        self.start_sec, self.end_sec = chunk_interval_sec
         self.species = species
         self.confidence = confidence
 
@@ -31,11 +31,29 @@ def test_initialize_db_creates_table(db_writer, test_db_path):
     assert cursor.fetchone() is not None
     conn.close()
 
+def test_initialize_db_indexes_timestamp(db_writer, test_db_path):
+    db_writer._initialize_db()
+    conn = sqlite3.connect(test_db_path)
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM detections WHERE timestamp_utc >= ? AND timestamp_utc < ?",
+        ("2025-08-05", "2025-08-06")).fetchall()
+    assert any("idx_detections_timestamp" in row[-1] for row in plan)
+    conn.close()
+
+def test_initialize_db_skips_autoincrement(db_writer, test_db_path):
+    db_writer._initialize_db()
+    conn = sqlite3.connect(test_db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE name='sqlite_sequence'")
+    assert cursor.fetchone() is None
+    conn.close()
+
 def test_write_batch_inserts_data(db_writer, test_db_path):
     db_writer._initialize_db()
     d1 = DummyDetection('2025-08-04T12:00:00Z', (0, 10), 'sparrow', 0.95)
     d2 = DummyDetection('2025-08-04T12:01:00Z', (10, 20), 'robin', 0.90)
-    db_writer._buffer = [d1, d2]
+    db_writer._add(d1)
+    db_writer._add(d2)
     db_writer._write_batch()
     conn = sqlite3.connect(test_db_path)
     cursor = conn.cursor()
@@ -44,6 +62,38 @@ def test_write_batch_inserts_data(db_writer, test_db_path):
     assert count == 2
     conn.close()
 
+def test_deferred_batches_share_one_commit(test_db_path, write_queue):
+    writer = DatabaseWriter(test_db_path, write_queue, commit_every=2)
+    writer._initialize_db()
+    reader = sqlite3.connect(test_db_path)
+    count = lambda: reader.execute("SELECT COUNT(*) FROM detections").fetchone()[0]
+
+    writer._add(DummyDetection('2025-08-04T12:00:00Z', (0, 3), 'sparrow', 0.95))
+    writer._write_batch(defer_commit=True)
+    assert count() == 0  # Still in the open transaction
+    writer._add(DummyDetection('2025-08-04T12:00:00Z', (3, 6), 'robin', 0.90))
+    writer._write_batch(defer_commit=True)
+    assert count() == 2
+    assert not writer._conn.in_transaction
+
+    writer._add(DummyDetection('2025-08-04T12:03:00Z', (0, 3), 'sparrow', 0.95))
+    writer._write_batch(defer_commit=True)
+    writer._write_batch()  # An idle flush commits whatever is pending
+    assert count() == 3
+    reader.close()
+
+def test_add_buffers_row_tuples(db_writer):
+    db_writer._add(DummyDetection('2025-08-04T12:00:00Z', (0, 10), 'sparrow', 0.95))
+    assert db_writer._buffer == [('2025-08-04T12:00:00Z', 0, 10, 'sparrow', 0.95)]
+
+def test_drain_stops_at_limit(db_writer, write_queue):
+    for i in range(5):
+        write_queue.put(DummyDetection('2025-08-04T12:00:00Z', (i, i + 3), 'sparrow', 0.95))
+    assert db_writer._drain(3) == 3
+    assert len(db_writer._buffer) == 3
+    assert db_writer._drain() == 2
+    assert write_queue.empty()
+
 def test_writer_loop_writes_from_queue(db_writer, write_queue, test_db_path):
     d1 = DummyDetection('2025-08-04T12:00:00Z', (0, 10), 'sparrow', 0.95)
     d2 = DummyDetection('2025-08-04T12:01:00Z', (10, 20), 'robin', 0.90)
@@ -58,3 +108,86 @@ def test_writer_loop_writes_from_queue(db_writer, write_queue, test_db_path):
     count = cursor.fetchone()[0]
     assert count == 2
     conn.close()
+
+def test_writer_loop_accepts_simple_queue(test_db_path):
+    write_queue = queue.SimpleQueue()
+    writer = DatabaseWriter(test_db_path, write_queue, batch_size=2, flush_interval=2)
+    write_queue.put(DummyDetection('2025-08-04T12:00:00Z', (0, 10), 'sparrow', 0.95))
+    write_queue.put(DummyDetection('2025-08-04T12:01:00Z', (10, 20), 'robin', 0.90))
+    writer.start()
+    writer.stop()
+    conn = sqlite3.connect(test_db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM detections")
+    assert cursor.fetchone()[0] == 2
+    conn.close()
+
+def test_initialize_db_enables_wal(db_writer, test_db_path):
+    db_writer._initialize_db()
+    conn = sqlite3.connect(test_db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+    assert db_writer._conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert db_writer._conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == 0
+
+def test_stop_truncates_wal_and_ends_checkpointer(test_db_path):
+    import os
+    write_queue = queue.SimpleQueue()
+    writer = DatabaseWriter(test_db_path, write_queue, batch_size=1, flush_interval=2,
+                            checkpoint_interval=0.05)
+    reader = sqlite3.connect(test_db_path)  # Keeps the WAL file from being removed on close
+    write_queue.put(DummyDetection('2025-08-04T12:00:00Z', (0, 10), 'sparrow', 0.95))
+    writer.start()
+    writer.stop()
+    assert not writer._checkpoint_thread.is_alive()
+    assert reader.execute("SELECT COUNT(*) FROM detections").fetchone()[0] == 1
+    assert os.path.getsize(test_db_path + "-wal") == 0
+    reader.close()
+
+def test_write_batch_drops_only_rejected_rows(db_writer, test_db_path):
+    db_writer._initialize_db()
+    good = DummyDetection('2025-08-04T12:00:00Z', (0, 10), 'sparrow', 0.95)
+    bad = DummyDetection('2025-08-04T12:01:00Z', (10, 20), None, 0.90)  # species is NOT NULL
+    db_writer._add(good)
+    db_writer._add(bad)
+    db_writer._write_batch()
+    assert not db_writer._conn.in_transaction
+    assert db_writer._buffer == []  # The bad row cannot block later flushes
+    conn = sqlite3.connect(test_db_path)
+    assert conn.execute("SELECT species FROM detections").fetchall() == [('sparrow',)]
+    conn.close()
+
+def test_write_batch_retries_busy_database_then_drops(db_writer, test_db_path):
+    db_writer.max_retries = 1
+    db_writer._initialize_db()
+    db_writer._conn.execute("PRAGMA busy_timeout=0")
+    blocker = sqlite3.connect(test_db_path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")  # Holds the write lock
+    db_writer._add(DummyDetection('2025-08-04T12:00:00Z', (0, 10), 'sparrow', 0.95))
+    db_writer._write_batch()
+    assert len(db_writer._buffer) == 1  # Kept for a retry
+    db_writer._write_batch()
+    assert db_writer._buffer == []  # Dropped once the retries are used up
+    blocker.execute("ROLLBACK")
+    blocker.close()
+
+def test_writer_loop_commits_deferred_rows_when_idle(test_db_path):
+    import time
+    write_queue = queue.SimpleQueue()
+    writer = DatabaseWriter(test_db_path, write_queue, batch_size=1, flush_interval=30, commit_every=10)
+    write_queue.put(DummyDetection('2025-08-04T12:00:00Z', (0, 10), 'sparrow', 0.95))
+    writer.start()
+    try:
+        deadline = time.monotonic() + 5
+        count = 0
+        while count == 0 and time.monotonic() < deadline:
+            time.sleep(0.1)
+            try:
+                reader = sqlite3.connect(test_db_path)
+                count = reader.execute("SELECT COUNT(*) FROM detections").fetchone()[0]
+                reader.close()
+            except sqlite3.OperationalError:
+                pass  # Table not created yet
+        assert count == 1  # Visible long before flush_interval
+    finally:
+        writer.stop()
@@ -30,5 +30,25 @@ class TestBirdDetection(unittest.TestCase):
         with self.assertRaises(AttributeError):
             bd.new_attr = 123
 
+    def test_tuple_behaviour(self):
+        bd = BirdDetection(self.timestamp, self.chunk_interval, self.species, self.confidence)
+        self.assertEqual(tuple(bd), (self.timestamp, 0, 10, self.species, self.confidence))
+        self.assertEqual(bd, BirdDetection(self.timestamp, 0, 10, self.species, self.confidence))
+        self.assertEqual((bd.start_sec, bd.end_sec), self.chunk_interval)
+
+    def test_keyword_construction(self):
+        bd = BirdDetection(timestamp_utc=self.timestamp, start_sec=0, end_sec=10,
+                           species=self.species, confidence=self.confidence)
+        self.assertEqual(bd.chunk_interval_sec, self.chunk_interval)
+        legacy = BirdDetection(timestamp_utc=self.timestamp, chunk_interval_sec=self.chunk_interval,
+                               species=self.species, confidence=self.confidence)
+        self.assertEqual(legacy, bd)
+
+    def test_interval_with_keyword_fields(self):
+        bd = BirdDetection(self.timestamp, self.chunk_interval, self.species, confidence=self.confidence)
+        self.assertEqual(tuple(bd), (self.timestamp, 0, 10, self.species, self.confidence))
+        bd = BirdDetection(self.timestamp, self.chunk_interval, species=self.species, confidence=self.confidence)
+        self.assertEqual(tuple(bd), (self.timestamp, 0, 10, self.species, self.confidence))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+import numpy as np
+from birdcode._fastbuf import chunk_stats
+
+class TestChunkStats(unittest.TestCase):
+    def test_silence(self):
+        rms, peak, zcr = chunk_stats(np.zeros(1000, dtype='float32'))
+        self.assertEqual((rms, peak, zcr), (0.0, 0.0, 0.0))
+
+    def test_square_wave(self):
+        samples = np.tile(np.array([0.5, -0.5], dtype='float32'), 500)
+        rms, peak, zcr = chunk_stats(samples)
+        self.assertAlmostEqual(rms, 0.5, places=5)
+        self.assertAlmostEqual(peak, 0.5, places=5)
+        self.assertAlmostEqual(zcr, 999 / 1000)
+
+    def test_empty(self):
+        self.assertEqual(chunk_stats(np.zeros(0, dtype='float32')), (0.0, 0.0, 0.0))
+
+    def test_int16_full_scale(self):
+        samples = np.tile(np.array([-32768, 32767], dtype='int16'), 500)
+        rms, peak, zcr = chunk_stats(samples)
+        self.assertAlmostEqual(rms / 32768, 1.0, places=4)
+        self.assertEqual(peak, 32768)
+
+if __name__ == "__main__":
+    unittest.main()
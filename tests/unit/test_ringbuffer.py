@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+from birdcode.ringbuffer import RingBuffer
+
+class TestRingBuffer(unittest.TestCase):
+    def test_capacity_rounds_up_to_power_of_two(self):
+        rb = RingBuffer(1000)
+        self.assertEqual(rb.size, 1024)
+        self.assertEqual(rb.read_available, 0)
+        self.assertEqual(rb.write_available, 1024)
+
+    def test_write_then_read_roundtrip(self):
+        rb = RingBuffer(16)
+        data = np.arange(10, dtype='float32')
+        self.assertEqual(rb.write(data), 10)
+        out = np.zeros(10, dtype='float32')
+        self.assertEqual(rb.readinto(out), 10)
+        np.testing.assert_array_equal(out, data)
+        self.assertEqual(rb.read_available, 0)
+
+    def test_wraparound(self):
+        rb = RingBuffer(16)
+        rb.write(np.zeros(12, dtype='float32'))
+        rb.readinto(np.zeros(12, dtype='float32'))
+        data = np.arange(10, dtype='float32')  # Straddles the end of the storage
+        rb.write(data)
+        out = np.zeros(10, dtype='float32')
+        self.assertEqual(rb.readinto(out), 10)
+        np.testing.assert_array_equal(out, data)
+
+    def test_partial_read(self):
+        rb = RingBuffer(16)
+        rb.write(np.arange(6, dtype='float32'))
+        out = np.zeros(4, dtype='float32')
+        self.assertEqual(rb.readinto(out), 4)
+        np.testing.assert_array_equal(out, [0, 1, 2, 3])
+        self.assertEqual(rb.read_available, 2)
+
+    def test_overflow_drops_instead_of_blocking(self):
+        rb = RingBuffer(16)
+        self.assertEqual(rb.write(np.ones(20, dtype='float32')), 16)
+        self.assertEqual(rb.dropped, 4)
+        self.assertEqual(rb.write_available, 0)
+
+    def test_writer_matches_write(self):
+        rb = RingBuffer(16)
+        push, data, state = rb.writer()
+        samples = np.arange(10, dtype='float32')
+        self.assertEqual(push(data, state, samples), 10)
+        out = np.zeros(10, dtype='float32')
+        rb.readinto(out)
+        np.testing.assert_array_equal(out, samples)
+
+    def test_int16_roundtrip(self):
+        rb = RingBuffer(16, 'int16')
+        data = np.arange(-5, 5, dtype='int16')
+        rb.write(data)
+        out = np.zeros(10, dtype='int16')
+        self.assertEqual(rb.readinto(out), 10)
+        np.testing.assert_array_equal(out, data)
+
+if __name__ == "__main__":
+    unittest.main()
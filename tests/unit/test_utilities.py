@@ -3,9 +3,11 @@ from unittest.mock import patch, MagicMock, mock_open
 import tempfile
 import os
 import logging
+import logging.handlers
 import json
 from pathlib import Path
 import sys
+import time
 
 import birdcode.utilities as utils
 
@@ -20,24 +22,100 @@ class TestUtilities(unittest.TestCase):
         with tempfile.TemporaryDirectory() as tmpdir:
             utils.configure_logging(tmpdir)
             logger = logging.getLogger()
-            handler_types = {type(h) for h in logger.handlers}
-            self.assertIn(logging.FileHandler, handler_types)
-            self.assertIn(logging.StreamHandler, handler_types)
-            # Close all handlers to release file lock before checking file existence
-            for handler in logger.handlers:
-                handler.flush()
-                handler.close()
+            self.assertEqual([type(h) for h in logger.handlers], [logging.handlers.QueueHandler])
+            listener_handlers = utils._listener.handlers
+            self.assertTrue(any(isinstance(h, logging.FileHandler) for h in listener_handlers))
+            self.assertIn(logging.StreamHandler, {type(h) for h in listener_handlers})
+            # Stop the listener to flush and release the log file before checking it
+            utils._reset_logging()
             log_path = Path(tmpdir) / "BirdListener.log"
             self.assertTrue(log_path.exists())
+            self.assertIn("Logging configured", log_path.read_text(encoding='utf-8'))
             # Remove handlers after test to avoid side effects
             logger.handlers.clear()
 
     def test_configure_logging_default_dir(self):
         utils.configure_logging()
-        logger = logging.getLogger()
-        handler_types = {type(h) for h in logger.handlers}
-        self.assertIn(logging.FileHandler, handler_types)
-        self.assertIn(logging.StreamHandler, handler_types)
+        listener_handlers = utils._listener.handlers
+        self.assertTrue(any(isinstance(h, logging.FileHandler) for h in listener_handlers))
+        self.assertIn(logging.StreamHandler, {type(h) for h in listener_handlers})
+        self.assertEqual(Path(listener_handlers[0].baseFilename).parent, Path.cwd())
+        utils._reset_logging()
+        logging.getLogger().handlers.clear()
+
+    def test_buffered_file_handler_flushes_on_warning(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_path = Path(tmpdir) / "test.log"
+            handler = utils.BufferedFileHandler(log_path, flush_interval=3600, encoding='utf-8')
+            test_logger = logging.getLogger("test_buffered_file_handler")
+            test_logger.propagate = False
+            test_logger.setLevel(logging.INFO)
+            test_logger.addHandler(handler)
+            try:
+                test_logger.warning("first")  # Flushes immediately
+                test_logger.info("second")  # Stays in the buffer
+                self.assertEqual(log_path.read_text(encoding='utf-8'), "first\n")
+                handler.close()
+                self.assertEqual(log_path.read_text(encoding='utf-8'), "first\nsecond\n")
+            finally:
+                test_logger.removeHandler(handler)
+
+    def test_buffered_file_handler_flushes_on_timer(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_path = Path(tmpdir) / "buffered.log"
+            handler = utils.BufferedFileHandler(log_path, flush_interval=0.05, encoding='utf-8')
+            test_logger = logging.getLogger("test_buffered_file_handler_timer")
+            test_logger.propagate = False
+            test_logger.setLevel(logging.INFO)
+            test_logger.addHandler(handler)
+            try:
+                test_logger.info("last of a burst")  # No later record arrives to flush it
+                deadline = time.monotonic() + 5
+                while not log_path.read_text(encoding='utf-8') and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                self.assertEqual(log_path.read_text(encoding='utf-8'), "last of a burst\n")
+            finally:
+                test_logger.removeHandler(handler)
+                handler.close()
+
+    def test_configure_logging_only_quiets_loaded_absl(self):
+        mock_absl_logging = MagicMock()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch.dict(sys.modules, {"absl.logging": mock_absl_logging}):
+                utils.configure_logging(tmpdir)
+            utils._reset_logging()
+        logging.getLogger().handlers.clear()
+        mock_absl_logging.set_verbosity.assert_called_once_with(mock_absl_logging.ERROR)
+        self.assertEqual(logging.getLogger('tensorflow').level, logging.ERROR)
+
+    def test_fast_formatter_matches_formatter(self):
+        fmt, datefmt = '%(asctime)s [%(levelname)s] %(name)s: %(message)s', '%Y-%m-%d %H:%M:%S'
+        fast, reference = utils.FastFormatter(fmt, datefmt=datefmt), logging.Formatter(fmt, datefmt=datefmt)
+        for created in (1754308800.1, 1754308800.9, 1754308801.2):
+            record = logging.LogRecord("bird", logging.INFO, __file__, 1, "msg %s", ("x",), None)
+            record.created = created
+            self.assertEqual(fast.format(record), reference.format(record))
+
+    def test_configure_logging_twice_keeps_handlers(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            utils.configure_logging(tmpdir)
+            listener = utils._listener
+            utils.configure_logging(tmpdir)
+            self.assertIs(utils._listener, listener)
+            self.assertEqual(len(logging.getLogger().handlers), 1)
+
+            with tempfile.TemporaryDirectory() as other_dir:
+                utils.configure_logging(other_dir)  # A new target directory reconfigures
+                self.assertIsNot(utils._listener, listener)
+                utils._reset_logging()
+        self.assertEqual(logging.getLogger().handlers, [])
+
+    def test_configure_logging_creates_nested_dir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_dir = Path(tmpdir) / "data" / "logs"
+            utils.configure_logging(str(log_dir))
+            utils._reset_logging()
+            self.assertTrue((log_dir / "BirdListener.log").exists())
 
     def test_get_config_reads_json(self):
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -48,6 +126,34 @@ class TestUtilities(unittest.TestCase):
             result = utils.get_config(config_path)
             self.assertEqual(result, data)
 
+    def test_get_config_rereads_modified_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_path = Path(tmpdir) / "test_config.json"
+            config_path.write_text('{"num": 1}')
+            first = utils.get_config(config_path)
+            first["num"] = 99  # Must not leak into the cached copy
+            self.assertEqual(utils.get_config(config_path), {"num": 1})
+
+            config_path.write_text('{"num": 2}')
+            os.utime(config_path, ns=(0, os.stat(config_path).st_mtime_ns + 1_000_000))
+            self.assertEqual(utils.get_config(config_path), {"num": 2})
+
+    def test_get_config_keys_cache_on_resolved_path(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name, num in (("a", 1), ("b", 2)):
+                os.mkdir(Path(tmpdir) / name)
+                config_path = Path(tmpdir) / name / "config.json"
+                config_path.write_text(f'{{"num": {num}}}')
+                os.utime(config_path, ns=(0, 1_000_000_000))  # Same mtime for both files
+            try:
+                os.chdir(Path(tmpdir) / "a")
+                self.assertEqual(utils.get_config(Path("config.json")), {"num": 1})
+                os.chdir(Path(tmpdir) / "b")
+                self.assertEqual(utils.get_config(Path("config.json")), {"num": 2})
+            finally:
+                os.chdir(cwd)
+
     @patch("birdcode.utilities.logging.warning")
     def test_get_config_fallback_to_default(self, mock_warning):
         # Simulate missing file, should fallback to cwd/config/config.json